@@ -1,71 +1,242 @@
-import json
-
-# --- Load your RIASEC question mapping ---
-with open("riasec_mapping.json", "r") as f:
-    QUESTIONS = json.load(f)
-
-# # --- Configurable weights ---
-# WEIGHT_INTEREST = 1.0
-# WEIGHT_APTITUDE = 1.2
-
-
-def score_riasec(responses):
-    """
-    responses: list of Likert-scale values (1–5), in same order as QUESTIONS
-    returns: dict of normalized RIASEC scores + top code
-    """
-    assert len(responses) == len(QUESTIONS), "Response count mismatch"
-
-    scores = {k: 0.0 for k in "RIASEC"}
-    counts = {k: 0 for k in "RIASEC"}
-
-    for q, score in zip(QUESTIONS, responses):
-        t = q["riasec"]
-        mult = -1 if q["negative"] else 1
-        # w = WEIGHT_APTITUDE if q["dimension"] == "aptitude" else WEIGHT_INTEREST
-        scores[t] += mult * score 
-        counts[t] += 1
-
-    # Average per RIASEC
-    for t in scores:
-        scores[t] = scores[t] / counts[t] if counts[t] > 0 else 0
-
-    # Normalize 0–100
-    min_score = min(scores.values())
-    max_score = max(scores.values())
-    if max_score != min_score:
-        for t in scores:
-            scores[t] = 100 * (scores[t] - min_score) / (max_score - min_score)
-    else:
-        for t in scores:
-            scores[t] = 50  # fallback if all equal
-
-    # Sort and label
-    sorted_types = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-    top_3 = "".join([x[0] for x in sorted_types[:3]])
-
-    return {
-        "scores": scores,
-        "top_3": top_3,
-        "ordered": sorted_types
-    }
-
-
-# --- Example ---
-if __name__ == "__main__":
-    # Dummy user answers (Likert 1–5)
-    user_responses = [
-        4, 2, 5, 1, 3, 5, 4, 2, 4, 3,
-        2, 5, 3, 5, 5, 4, 4, 5, 2, 2,
-        4, 1, 5, 5, 4, 5, 3, 4, 5, 4,
-        5, 4, 5
-    ]
-
-    result = score_riasec(user_responses)
-    print("RIASEC Scores:", result["scores"])
-    print("Top 3 Code:", result["top_3"])
-
-    # find the occurence for each letter in the questions mapping
-    for letter in "RIASEC":
-        count = sum(1 for q in QUESTIONS if q["riasec"] == letter)
-        print(f"Count of {letter} questions: {count}")
+import functools
+import json
+from typing import NamedTuple
+
+try:
+    import numpy as np
+except ImportError:  # score_riasec falls back to the pure-Python path
+    np = None
+
+try:
+    import numba
+except ImportError:  # _normalize_np falls back to np.bincount
+    numba = None
+
+# RIASEC letter <-> index lookups used for every conversion
+_IDX_TO_LETTER = "RIASEC"
+_LETTER_TO_IDX = {c: i for i, c in enumerate(_IDX_TO_LETTER)}
+
+MAPPING_PATH = "riasec_mapping.json"
+# Valid Likert answers - anything else would be truncated/wrapped by the int8
+# NumPy paths but not by the pure-Python one
+_LIKERT_VALUES = frozenset(range(1, 6))
+
+
+def _load_questions():
+    """Parse the RIASEC question mapping JSON"""
+    with open(MAPPING_PATH, "rb") as f:
+        return json.loads(f.read())
+
+
+def _load_tables():
+    """returns: (type_idx list, sign list) per question"""
+    questions = _load_questions()
+    type_idx = [_LETTER_TO_IDX[q["riasec"]] for q in questions]
+    sign = [-1 if q["negative"] else 1 for q in questions]
+    return type_idx, sign
+
+
+# --- Precomputed lookup tables (questions are fixed after load) ---
+# Compact (type_idx, sign) pairs so the pure-Python loop avoids dict lookups
+_Q_COMPACT = tuple(zip(*_load_tables()))
+_N_Q = len(_Q_COMPACT)
+_COUNTS = [0] * 6
+for _t, _ in _Q_COMPACT:
+    _COUNTS[_t] += 1
+COUNTS_BY_LETTER = dict(zip(_IDX_TO_LETTER, _COUNTS))
+
+if np is not None:
+    # TYPE_IDX[i] is the RIASEC index (0..5) of question i, SIGN[i] is -1 for
+    # negatively-keyed questions and +1 otherwise.
+    TYPE_IDX = np.array([t for t, _ in _Q_COMPACT], dtype=np.int8)
+    SIGN = np.array([s for _, s in _Q_COMPACT], dtype=np.int8)
+    COUNTS = np.bincount(TYPE_IDX, minlength=6)
+
+    # Signed one-hot mapping (question -> RIASEC column) so a whole batch of
+    # respondents can be reduced with one matmul
+    SIGNED_ONEHOT = np.zeros((_N_Q, 6), dtype=np.int8)
+    SIGNED_ONEHOT[np.arange(_N_Q), TYPE_IDX] = SIGN
+    # float32 copy for the batch reduction: integer matmul has no BLAS path,
+    # float32 GEMM does (and sums up to 5 * _N_Q are exact in float32)
+    _SIGNED_ONEHOT_F32 = SIGNED_ONEHOT.astype(np.float32)
+
+# --- Optional JIT-compiled scoring kernel ---
+# The tables are passed in rather than read as globals, so the compiled code
+# can be cached to disk (cache=True) and stays correct when
+# riasec_mapping.json changes
+if numba is not None and np is not None:
+    @numba.njit(cache=True)
+    def _kernel(responses_i8, type_idx_i8, sign_i8):
+        """Single pass over int8 inputs: returns float32 per-type sums"""
+        sums = np.zeros(6, dtype=np.float32)
+        for i in range(responses_i8.shape[0]):
+            sums[type_idx_i8[i]] += sign_i8[i] * responses_i8[i]
+        return sums
+else:
+    _kernel = None
+
+# # --- Configurable weights ---
+# WEIGHT_INTEREST = 1.0
+# WEIGHT_APTITUDE = 1.2
+
+
+class RiasecResult(NamedTuple):
+    """
+    scores: normalized 0–100 scores in RIASEC order (read-only array, or a
+            tuple when NumPy is not installed)
+    top_3: top 3 RIASEC code, e.g. "ISA"
+    order: RIASEC indices sorted by descending score (ties keep RIASEC order)
+    """
+    scores: "np.ndarray"
+    top_3: str
+    order: "np.ndarray"
+
+    def as_dict(self):
+        """returns: the plain dict format (scores dict, top_3, ordered pairs)"""
+        scores = [float(v) for v in self.scores]
+        return {
+            "scores": dict(zip(_IDX_TO_LETTER, scores)),
+            "top_3": self.top_3,
+            "ordered": [(_IDX_TO_LETTER[i], scores[i]) for i in self.order]
+        }
+
+
+def _normalize_np(responses_t):
+    """NumPy path: returns (normalized scores array, order array)"""
+    r = np.asarray(responses_t, dtype=np.int8)
+    # w = WEIGHT_APTITUDE if q["dimension"] == "aptitude" else WEIGHT_INTEREST
+    if _kernel is not None:
+        sums = _kernel(r, TYPE_IDX, SIGN)
+    else:
+        sums = np.bincount(TYPE_IDX, weights=SIGN * r, minlength=6)
+
+    # Average per RIASEC
+    avg = sums / np.maximum(COUNTS, 1)
+
+    # Normalize 0–100 (fallback to 50 if all equal)
+    lo, rng = avg.min(), np.ptp(avg)
+    normed = np.full(6, 50.0) if rng == 0 else 100.0 * (avg - lo) / rng
+
+    # Stable, so ties keep RIASEC order
+    order = np.argsort(-normed, kind="stable")
+    return normed, order
+
+
+def _normalize_py(responses_t):
+    """Pure-Python path over _Q_COMPACT: returns (normalized scores tuple, order tuple)"""
+    sums = [0] * 6
+    for (t, s), score in zip(_Q_COMPACT, responses_t):
+        sums[t] += s * score
+
+    # Average per RIASEC
+    avg = [sums[t] / c if c else 0 for t, c in enumerate(_COUNTS)]
+
+    # Normalize 0–100 (fallback to 50 if all equal)
+    lo, hi = min(avg), max(avg)
+    if hi == lo:
+        normed = [50.0] * 6
+    else:
+        normed = [100.0 * (a - lo) / (hi - lo) for a in avg]
+
+    # sorted() is stable, so ties keep RIASEC order
+    order = sorted(range(6), key=normed.__getitem__, reverse=True)
+    return tuple(normed), tuple(order)
+
+
+@functools.lru_cache(maxsize=4096)
+def _score_riasec_cached(responses_t):
+    """
+    responses_t: tuple of Likert-scale values, already length-checked
+    returns: RiasecResult - arrays are made read-only so the cached value can
+    be shared between callers without copying
+    """
+    if np is not None:
+        normed, order = _normalize_np(responses_t)
+        normed.flags.writeable = False
+        order.flags.writeable = False
+    else:
+        normed, order = _normalize_py(responses_t)
+
+    top_3 = "".join(_IDX_TO_LETTER[i] for i in order[:3])
+    return RiasecResult(normed, top_3, order)
+
+
+def score_riasec(responses):
+    """
+    responses: list of Likert-scale values (1–5), in same order as the
+               questions in riasec_mapping.json
+    returns: RiasecResult of normalized RIASEC scores + top code
+             (call .as_dict() for the plain dict format)
+    """
+    if len(responses) != _N_Q:
+        raise ValueError(
+            f"Response count mismatch: expected {_N_Q}, got {len(responses)}")
+    if not _LIKERT_VALUES.issuperset(responses):
+        raise ValueError("Responses must be integers from 1 to 5")
+
+    # Only valid full-length vectors reach the cache
+    return _score_riasec_cached(tuple(responses))
+
+
+def score_riasec_batch(responses_matrix):
+    """
+    responses_matrix: (N, number of questions) array of Likert-scale values (1–5),
+                      one respondent per row
+    returns: dict with (N, 6) normalized scores (columns in RIASEC order)
+             + list of top-3 codes
+    """
+    if np is None:
+        raise ImportError("score_riasec_batch requires NumPy")
+
+    R = np.asarray(responses_matrix)
+    if R.ndim != 2 or R.shape[1] != _N_Q:
+        raise ValueError(
+            f"Expected an (N, {_N_Q}) response matrix, got shape {R.shape}")
+    if not np.isin(R, tuple(_LIKERT_VALUES)).all():
+        raise ValueError("Responses must be integers from 1 to 5")
+
+    # (N, Q) @ (Q, 6) -> per-type sums as a float32 GEMM, then average per RIASEC
+    # (one cast straight to float32, none at all for float32 input)
+    sums = R.astype(np.float32, copy=False) @ _SIGNED_ONEHOT_F32
+    avg = sums / np.maximum(COUNTS, 1).astype(np.float32)
+
+    # Normalize 0–100 row-wise (fallback to 50 where a row is all equal)
+    lo = avg.min(axis=1, keepdims=True)
+    rng = np.ptp(avg, axis=1, keepdims=True)
+    flat = rng == 0
+    normed = np.where(flat, np.float32(50), 100 * (avg - lo) / np.where(flat, 1, rng))
+
+    # Top 3 per row by partial selection (three argmax passes) instead of a
+    # full sort; argmax returns the first maximum, so ties keep RIASEC order
+    masked = normed.copy()
+    rows = np.arange(len(masked))
+    top_idx = np.empty((len(masked), 3), dtype=np.intp)
+    for k in range(3):
+        top_idx[:, k] = masked.argmax(axis=1)
+        masked[rows, top_idx[:, k]] = -np.inf
+    letters = np.array(list(_IDX_TO_LETTER))
+    top_3 = ["".join(row) for row in letters[top_idx]]
+
+    return {
+        "scores": normed,
+        "top_3": top_3
+    }
+
+
+# --- Example ---
+if __name__ == "__main__":
+    # Dummy user answers (Likert 1–5)
+    user_responses = [
+        4, 2, 5, 1, 3, 5, 4, 2, 4, 3,
+        2, 5, 3, 5, 5, 4, 4, 5, 2, 2,
+        4, 1, 5, 5, 4, 5, 3, 4, 5, 4,
+        5, 4, 5
+    ]
+
+    result = score_riasec(user_responses).as_dict()
+    print("RIASEC Scores:", result["scores"])
+    print("Top 3 Code:", result["top_3"])
+
+    # find the occurence for each letter in the questions mapping
+    for letter, count in COUNTS_BY_LETTER.items():
+        print(f"Count of {letter} questions: {count}")
@@ -303,11 +303,25 @@ router.post('/message', authenticateToken, async (req: Request, res: Response) =
     // Use provided language or default to English
     const userLanguage = language || 'en';
 
+    // Clients that send "Accept: application/x-ndjson" get the reply as it is
+    // generated: {"delta": ...} lines, then the final ChatMessageResponse line.
+    // The content type goes out with the first line, so an error before that
+    // still gets the plain JSON 500 below.
+    const streamReply =
+      req.accepts(['json', 'application/x-ndjson']) === 'application/x-ndjson';
+    const writeLine = (line: object) => {
+      if (!res.headersSent) {
+        res.setHeader('Content-Type', 'application/x-ndjson; charset=utf-8');
+      }
+      res.write(JSON.stringify(line) + '\n');
+    };
+
     // Generate bot response using RAG with language parameter
     const botReply = await getRAGService().chat(
       message,
       contextMessages,
-      userLanguage
+      userLanguage,
+      streamReply ? (delta) => writeLine({ delta }) : undefined
     );
 
     // Save bot message to database
@@ -326,6 +340,11 @@ router.post('/message', authenticateToken, async (req: Request, res: Response) =
       intent: 'general', // RAG doesn't provide intent classification
     };
 
+    if (streamReply) {
+      writeLine(response);
+      res.end();
+      return;
+    }
     res.json(response);
   } catch (error: any) {
     console.error('Error processing chat message:', error);
@@ -337,6 +356,11 @@ router.post('/message', authenticateToken, async (req: Request, res: Response) =
       intent: 'error',
     };
 
+    // A streamed reply has already sent its status - end it with the fallback
+    if (res.headersSent) {
+      res.end(JSON.stringify(fallback) + '\n');
+      return;
+    }
     res.status(500).json(fallback);
   }
 });
@@ -1,4 +1,5 @@
 import { spawn, ChildProcess } from "child_process";
+import http from "http";
 import path from "path";
 import fs from "fs";
 import type { Language } from "../types";
@@ -19,15 +20,35 @@ interface RAGResponse {
 }
 
 interface PythonResponse {
-  status: "success" | "error";
+  status: "success" | "error" | "stream";
   message?: string;
   data?: RAGResponse;
+  delta?: string; // "stream" frames of a streaming chat
 }
 
+/** /health reply: which service configuration the server was started with */
+interface HealthResponse extends PythonResponse {
+  provider: string;
+  careers_json_path: string;
+  chroma_persist_dir: string;
+}
+
+/** Receives chat response text as the LLM generates it */
+type DeltaHandler = (delta: string) => void;
+
+/**
+ * How Node talks to Python:
+ * - "socket": persistent HTTP server (rag_server.py) on a Unix domain socket,
+ *   reused across Node restarts and able to serve concurrent chats
+ * - "stdio": one child process reading JSON commands line by line (rag_service.py)
+ */
+type RAGTransport = "socket" | "stdio";
+
 interface PendingRequest {
   resolve: (value: PythonResponse) => void;
   reject: (error: Error) => void;
   timeout: NodeJS.Timeout;
+  onDelta?: DeltaHandler;
 }
 
 export class RAGChatService {
@@ -39,6 +60,8 @@ export class RAGChatService {
   private initializationPromise: Promise<void> | null = null;
   private pendingRequests: PendingRequest[] = [];
   private outputBuffer: string = "";
+  private transport: RAGTransport;
+  private socketPath: string;
 
   constructor(provider: string = "google") {
     this.provider = provider;
@@ -47,6 +70,16 @@ export class RAGChatService {
     const backendDir = path.resolve(__dirname, "../..");
     this.careersJsonPath = path.join(backendDir, "careers_cleaned.json");
     this.chromaPersistDir = path.join(backendDir, "chroma_data_multilingual");
+
+    // asyncio has no Unix socket server on Windows, so keep the stdin pipe there
+    this.transport =
+      (process.env.RAG_TRANSPORT as RAGTransport) ||
+      (process.platform === "win32" ? "stdio" : "socket");
+    // Same default as `npm run rag:server`, so a server started by hand is found.
+    // Kept in a private per-user directory, not /tmp: the server holds the
+    // LLM API key and sees every chat.
+    this.socketPath =
+      process.env.RAG_SOCKET_PATH || path.join(backendDir, ".rag", "rag.sock");
   }
 
   /**
@@ -77,6 +110,13 @@ export class RAGChatService {
     try {
       const response: PythonResponse = JSON.parse(line);
 
+      // Streaming frames belong to the oldest request, which stays pending
+      // until its final frame arrives
+      if (response.status === "stream") {
+        this.pendingRequests[0]?.onDelta?.(response.delta || "");
+        return;
+      }
+
       // Get the next pending request (FIFO)
       const pending = this.pendingRequests.shift();
 
@@ -97,12 +137,294 @@ export class RAGChatService {
   }
 
   /**
-   * Initialize the Python process (only once)
+   * Forward Python stderr to the console, skipping routine messages
+   */
+  private attachStderr(child: ChildProcess): void {
+    // CRITICAL: Explicitly set encoding to utf-8
+    child.stderr?.setEncoding("utf-8");
+    child.stderr?.on("data", (data: string) => {
+      const msg = data.trim();
+      // Filter out routine messages
+      if (
+        !msg.includes("redirects.py") &&
+        !msg.includes("Loaded .env") &&
+        !msg.includes("Started and waiting")
+      ) {
+        console.error(`[RAG]: ${msg}`);
+      }
+    });
+  }
+
+  /**
+   * Send an HTTP request to the RAG server over the Unix socket
+   * (with onDelta, the response is read as NDJSON frames)
+   */
+  private requestServer(
+    method: "GET" | "POST",
+    route: string,
+    body?: object,
+    timeoutMs: number = 90000,
+    onDelta?: DeltaHandler
+  ): Promise<PythonResponse> {
+    return new Promise((resolve, reject) => {
+      const payload = body ? JSON.stringify(body) : undefined;
+      const req = http.request(
+        {
+          socketPath: this.socketPath,
+          path: route,
+          method,
+          headers: payload
+            ? {
+                "Content-Type": "application/json; charset=utf-8",
+                "Content-Length": Buffer.byteLength(payload, "utf-8"),
+              }
+            : undefined,
+        },
+        (res) => {
+          res.setEncoding("utf-8");
+          let data = "";
+          res.on("data", (chunk: string) => {
+            data += chunk;
+            if (!onDelta) {
+              return;
+            }
+
+            // Forward complete "stream" frames, keep the rest for "end"
+            const lines = data.split("\n");
+            data = lines.pop() || "";
+            for (const line of lines) {
+              const trimmed = line.trim();
+              if (!trimmed) {
+                continue;
+              }
+              let frame: PythonResponse | null = null;
+              try {
+                frame = JSON.parse(trimmed);
+              } catch {
+                // Left for the "end" handler to report
+              }
+              if (frame?.status === "stream") {
+                onDelta(frame.delta || "");
+              } else {
+                data = trimmed;
+              }
+            }
+          });
+          res.on("end", () => {
+            let response: PythonResponse;
+            try {
+              response = JSON.parse(data);
+            } catch (error: any) {
+              reject(new Error(`Invalid response from RAG server: ${data}`));
+              return;
+            }
+            if (response.status === "error" || (res.statusCode ?? 500) >= 400) {
+              reject(new Error(response.message || "Unknown error"));
+            } else {
+              resolve(response);
+            }
+          });
+        }
+      );
+
+      req.setTimeout(timeoutMs, () => {
+        req.destroy(new Error(`Request timeout (${timeoutMs / 1000}s)`));
+      });
+      req.on("error", reject);
+
+      // CRITICAL: Write with explicit UTF-8 encoding
+      if (payload) {
+        req.write(payload, "utf-8");
+      }
+      req.end();
+    });
+  }
+
+  /**
+   * Get the health reply of the RAG server on the socket, or null if none
+   * is listening (or it is still loading)
+   */
+  private async getServerHealth(): Promise<HealthResponse | null> {
+    try {
+      return (await this.requestServer(
+        "GET",
+        "/health",
+        undefined,
+        2000
+      )) as HealthResponse;
+    } catch {
+      return null;
+    }
+  }
+
+  /**
+   * Make sure a running server was started with this service's settings
+   */
+  private checkServerConfig(health: HealthResponse): void {
+    const mismatches = [
+      ["provider", health.provider, this.provider],
+      ["careers_json_path", health.careers_json_path, this.careersJsonPath],
+      ["chroma_persist_dir", health.chroma_persist_dir, this.chromaPersistDir],
+    ].filter(([name, actual, expected]) =>
+      name === "provider"
+        ? actual !== expected
+        : path.resolve(actual || "") !== path.resolve(expected)
+    );
+
+    if (mismatches.length > 0) {
+      const details = mismatches
+        .map(([name, actual, expected]) => `${name}=${actual} (expected ${expected})`)
+        .join(", ");
+      throw new Error(
+        `RAG server at ${this.socketPath} was started with different settings: ` +
+          `${details}. Stop it (pkill -f rag_server:app) or set RAG_SOCKET_PATH`
+      );
+    }
+  }
+
+  /**
+   * Create the socket's directory, private (0700) when this user owns it
+   */
+  private prepareSocketDir(): void {
+    const dir = path.dirname(this.socketPath);
+    fs.mkdirSync(dir, { recursive: true, mode: 0o700 });
+    // A shared directory (e.g. /tmp via RAG_SOCKET_PATH) can't be locked
+    // down - the 0600 socket from secureSocket() covers that case
+    if (fs.statSync(dir).uid === process.getuid!()) {
+      fs.chmodSync(dir, 0o700);
+    }
+  }
+
+  /**
+   * Check that an existing socket belongs to this user and make it 0600
+   * (uvicorn creates it 0666). Another user's socket could impersonate the
+   * server and receive every chat, so it is refused.
+   * Returns false if there is no socket yet.
+   */
+  private secureSocket(): boolean {
+    const stats = fs.lstatSync(this.socketPath, { throwIfNoEntry: false });
+    if (!stats) {
+      return false;
+    }
+
+    if (!stats.isSocket() || stats.uid !== process.getuid!()) {
+      throw new Error(
+        `${this.socketPath} is not a socket owned by this user - ` +
+          `remove it or set RAG_SOCKET_PATH`
+      );
+    }
+    fs.chmodSync(this.socketPath, 0o600);
+    return true;
+  }
+
+  /**
+   * True for errors meaning no server is listening on the socket any more
+   */
+  private static isConnectionError(error: any): boolean {
+    return error?.code === "ENOENT" || error?.code === "ECONNREFUSED";
+  }
+
+  /**
+   * Connect to the persistent RAG server, starting it if none is running
+   */
+  private async initializeServer(): Promise<void> {
+    // Reuse a server that survived a Node restart (or was started by hand)
+    this.prepareSocketDir();
+    const health = this.secureSocket() ? await this.getServerHealth() : null;
+    if (health) {
+      this.checkServerConfig(health);
+      this.isInitialized = true;
+      console.log(`[RAG] Connected to running RAG server at ${this.socketPath}`);
+      return;
+    }
+
+    const backendDir = path.resolve(__dirname, "../..");
+    const pythonExecutable = this.getPythonExecutable();
+
+    // Detached with its output in a log file, so the server (and its loaded
+    // model) can outlive this Node process
+    const logPath = path.join(backendDir, "rag_server.log");
+    const logFd = fs.openSync(logPath, "a");
+    console.log(
+      `[RAG] Starting persistent RAG server: ${pythonExecutable} (log: ${logPath})`
+    );
+
+    const server = spawn(
+      pythonExecutable,
+      [
+        "-m",
+        "uvicorn",
+        "rag_server:app",
+        "--app-dir",
+        __dirname,
+        "--uds",
+        this.socketPath,
+        "--loop",
+        "uvloop",
+        "--http",
+        "httptools",
+      ],
+      {
+        stdio: ["ignore", logFd, logFd],
+        cwd: backendDir,
+        detached: true,
+        env: {
+          ...process.env,
+          PYTHONIOENCODING: "utf-8",
+          PYTHONUTF8: "1",
+          LANG: "en_US.UTF-8",
+          LC_ALL: "en_US.UTF-8",
+          RAG_PROVIDER: this.provider,
+          RAG_CAREERS_JSON_PATH: this.careersJsonPath,
+          RAG_CHROMA_PERSIST_DIR: this.chromaPersistDir,
+        },
+      }
+    );
+    fs.closeSync(logFd);
+
+    let exitCode: number | null | undefined;
+    server.on("close", (code: number | null) => {
+      exitCode = code;
+      console.log(`[RAG] RAG server exited with code: ${code}`);
+      this.isInitialized = false;
+      this.initializationPromise = null;
+    });
+
+    // The socket only accepts connections once the model is loaded
+    const deadline = Date.now() + 120000;
+    while (Date.now() < deadline) {
+      if (exitCode !== undefined) {
+        throw new Error(
+          `RAG server exited with code ${exitCode}, see ${logPath}`
+        );
+      }
+      const startedHealth = this.secureSocket()
+        ? await this.getServerHealth()
+        : null;
+      if (startedHealth) {
+        this.checkServerConfig(startedHealth);
+        server.unref();
+        this.isInitialized = true;
+        console.log("[RAG] Service initialized successfully");
+        return;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 500));
+    }
+
+    server.kill("SIGTERM");
+    throw new Error(`Initialization timeout (120s), see ${logPath}`);
+  }
+
+  /**
+   * Initialize the RAG service (only once)
    * Can be called externally to preload the service
    */
   async initialize(): Promise<void> {
     // If already initialized, return immediately
-    if (this.isInitialized && this.pythonProcess) {
+    if (
+      this.isInitialized &&
+      (this.transport === "socket" || this.pythonProcess)
+    ) {
       return;
     }
 
@@ -111,6 +433,18 @@ export class RAGChatService {
       return this.initializationPromise;
     }
 
+    if (this.transport === "socket") {
+      this.initializationPromise = this.initializeServer().catch(
+        (error: any) => {
+          this.initializationPromise = null;
+          throw new Error(
+            `Failed to initialize RAG service: ${error.message}`
+          );
+        }
+      );
+      return this.initializationPromise;
+    }
+
     // Start new initialization
     this.initializationPromise = new Promise(async (resolve, reject) => {
       try {
@@ -154,19 +488,7 @@ export class RAGChatService {
         });
 
         // Handle stderr - log errors
-        // CRITICAL: Explicitly set encoding to utf-8
-        this.pythonProcess.stderr?.setEncoding("utf-8");
-        this.pythonProcess.stderr?.on("data", (data: string) => {
-          const msg = data.trim();
-          // Filter out routine messages
-          if (
-            !msg.includes("redirects.py") &&
-            !msg.includes("Loaded .env") &&
-            !msg.includes("Started and waiting")
-          ) {
-            console.error(`[RAG]: ${msg}`);
-          }
-        });
+        this.attachStderr(this.pythonProcess);
 
         // Handle process exit
         this.pythonProcess.on("close", (code: number | null) => {
@@ -245,10 +567,36 @@ export class RAGChatService {
   /**
    * Send a command to the Python process
    */
-  private async sendCommand(command: any): Promise<PythonResponse> {
+  private async sendCommand(
+    command: any,
+    onDelta?: DeltaHandler
+  ): Promise<PythonResponse> {
     // Ensure initialized
     await this.initialize();
 
+    if (this.transport === "socket") {
+      // {command: "chat", ...body} -> POST /chat with body
+      const { command: route, ...body } = command;
+      try {
+        return await this.requestServer("POST", `/${route}`, body, 90000, onDelta);
+      } catch (error: any) {
+        if (!RAGChatService.isConnectionError(error)) {
+          throw error;
+        }
+        // The server went away (killed, crashed, machine slept...) - connect
+        // to or start a new one and retry once
+        // (only the first failing request resets; concurrent ones then wait
+        // on the same initializationPromise)
+        console.warn(`[RAG] Lost RAG server (${error.code}), reconnecting`);
+        if (this.isInitialized) {
+          this.isInitialized = false;
+          this.initializationPromise = null;
+        }
+        await this.initialize();
+        return this.requestServer("POST", `/${route}`, body, 90000, onDelta);
+      }
+    }
+
     if (!this.pythonProcess || !this.isInitialized) {
       throw new Error("RAG service not initialized");
     }
@@ -270,6 +618,7 @@ export class RAGChatService {
         resolve,
         reject,
         timeout,
+        onDelta,
       });
 
       // Send command with explicit UTF-8 encoding
@@ -293,11 +642,14 @@ export class RAGChatService {
   /**
    * Send a chat message and get a response
    * Handles full UTF-8 flow: Hindi input → processing → Hindi output
+   * Pass onDelta to receive the response as it streams from the LLM
+   * (the full response is still returned at the end)
    */
   async chat(
     message: string,
     chatHistory: ChatHistoryMessage[] = [],
-    language: Language = "en"
+    language: Language = "en",
+    onDelta?: DeltaHandler
   ): Promise<string> {
     // Verify message is properly encoded (defensive check)
     if (typeof message !== "string") {
@@ -310,12 +662,16 @@ export class RAGChatService {
       content: String(msg.content), // Ensure content is string
     }));
 
-    const response = await this.sendCommand({
-      command: "chat",
-      message: message,
-      chat_history: sanitizedHistory,
-      language: language,
-    });
+    const response = await this.sendCommand(
+      {
+        command: "chat",
+        message: message,
+        chat_history: sanitizedHistory,
+        language: language,
+        stream: onDelta !== undefined,
+      },
+      onDelta
+    );
 
     if (response.data && response.data.response) {
       // Response should already be in the specified language
@@ -350,6 +706,7 @@ export class RAGChatService {
 
   /**
    * Gracefully shutdown the Python process
+   * (a socket server is left running so the next Node process can reuse it)
    */
   async shutdown(): Promise<void> {
     if (this.pythonProcess) {
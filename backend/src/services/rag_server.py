@@ -0,0 +1,112 @@
+"""
+Persistent RAG server for the Career Guidance Chatbot
+Keeps a single RAGChatService (embedding model, Chroma DB, LLM client) loaded
+and serves it over HTTP on a Unix domain socket, so Node.js restarts don't pay
+the model load again and concurrent chats overlap their LLM wait time.
+
+Run from the backend directory (`npm run rag:server`); the socket lives in
+the private .rag directory, since the server holds the LLM API key:
+    mkdir -p .rag && chmod 700 .rag
+    python -m uvicorn rag_server:app --app-dir src/services --uds .rag/rag.sock --loop uvloop --http httptools
+"""
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+from fastapi import FastAPI
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, StreamingResponse
+import asyncio
+import msgspec
+import os
+
+from rag_service import RAGChatService, backend_dir
+
+
+# Configuration (Node.js passes these when it starts the server)
+CAREERS_JSON_PATH = os.getenv(
+    "RAG_CAREERS_JSON_PATH", str(backend_dir / "careers_cleaned.json"))
+CHROMA_PERSIST_DIR = os.getenv(
+    "RAG_CHROMA_PERSIST_DIR", str(backend_dir / "chroma_data_multilingual"))
+PROVIDER = os.getenv("RAG_PROVIDER", "google")
+
+
+class ChatRequest(BaseModel):
+    message: str
+    chat_history: List[Dict[str, Any]] = Field(default_factory=list)
+    language: str = "en"
+    stream: bool = False
+
+
+class GreetingRequest(BaseModel):
+    assessment_summary: str
+    language: str = "en"
+
+
+rag_service: Optional[RAGChatService] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the service once at startup - the socket only accepts requests after this"""
+    global rag_service
+    rag_service = await asyncio.to_thread(
+        RAGChatService, CAREERS_JSON_PATH, CHROMA_PERSIST_DIR, PROVIDER)
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+# Errors use the same shape as the stdin protocol in rag_service.main()
+@app.exception_handler(RequestValidationError)
+async def handle_validation_error(request, exc: RequestValidationError):
+    return JSONResponse(status_code=422, content={
+        "status": "error",
+        "message": str(exc)
+    })
+
+
+@app.exception_handler(Exception)
+async def handle_error(request, exc: Exception):
+    return JSONResponse(status_code=500, content={
+        "status": "error",
+        "message": str(exc)
+    })
+
+
+@app.get("/health")
+async def health() -> Dict:
+    # Node checks these before reusing a server that is already running
+    return {
+        "status": "success",
+        "message": "RAG service initialized",
+        "provider": PROVIDER,
+        "careers_json_path": os.path.abspath(CAREERS_JSON_PATH),
+        "chroma_persist_dir": os.path.abspath(CHROMA_PERSIST_DIR)
+    }
+
+
+async def _ndjson(frames):
+    async for frame in frames:
+        yield msgspec.json.encode(frame) + b"\n"
+
+
+@app.post("/chat")
+async def chat(request: ChatRequest):
+    if request.stream:
+        # Same NDJSON frames as the stdin protocol's streaming chat
+        return StreamingResponse(
+            _ndjson(rag_service.achat_stream(
+                request.message, request.chat_history, request.language)),
+            media_type="application/x-ndjson")
+
+    result = await rag_service.achat(
+        request.message, request.chat_history, request.language)
+    return {"status": "success", "data": result}
+
+
+@app.post("/greeting")
+async def greeting(request: GreetingRequest) -> Dict:
+    result = await rag_service.agenerate_initial_greeting(
+        request.assessment_summary, request.language)
+    return {"status": "success", "data": result}
@@ -4,24 +4,34 @@ This service wraps the RAG chatbot functionality for integration with the Node.j
 """
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_core.messages import HumanMessage, AIMessage
-from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_chroma import Chroma
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from semantic_text_splitter import TextSplitter
 from dotenv import load_dotenv
-import json
+import asyncio
+import chromadb
+import functools
+import hashlib
+import msgspec
+import numpy as np
 import os
 import sys
-import io
-from typing import List, Dict, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 from pathlib import Path
 
-# CRITICAL: Set up proper UTF-8 encoding for stdin/stdout
+# CRITICAL: Set up proper UTF-8 encoding for stdout/stderr
 # This fixes encoding issues with Hindi, Telugu, and other Unicode languages
-sys.stdin = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', errors='replace')
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+# (stdin is read as raw UTF-8 bytes and decoded by msgspec in main())
+# reconfigure() keeps the existing streams and their buffering - a no-op
+# when Python already runs in UTF-8 mode
+for _stream in (sys.stdout, sys.stderr):
+    if _stream.encoding.lower() != "utf-8" or _stream.errors != "replace":
+        _stream.reconfigure(encoding="utf-8", errors="replace")
 
 # Load environment variables from .env file
 # Look for .env in backend directory (parent of src)
@@ -41,9 +51,185 @@ sys.path.insert(0, str(backend_dir))
 # Configuration
 CHUNK_SIZE = 512
 CHUNK_OVERLAP = 150
+EMBEDDING_MODEL = "BAAI/bge-m3"
+EMBEDDING_BATCH_SIZE = 256
+# Token limit of bge-m3, applied by every embeddings backend (CHUNK_SIZE is
+# the splitter's capacity in characters, not tokens)
+EMBEDDING_MAX_TOKENS = 8192
+# Chunks per collection.add() when building the DB (one HNSW/SQLite commit each)
+CHROMA_ADD_BATCH_SIZE = 1024
+# Embedding backend: "huggingface" (in-process sentence-transformers, FP16 +
+# torch.compile when a CUDA GPU is available),
+# "infinity" (batched Infinity server, e.g.
+# `infinity_emb v2 --model-id BAAI/bge-m3 --port 7997 --dtype float16`) or
+# "onnx" (int8-quantized ONNX export run with onnxruntime on CPU)
+EMBEDDINGS_BACKEND = os.getenv("RAG_EMBEDDINGS_BACKEND", "huggingface")
+INFINITY_API_URL = os.getenv("INFINITY_API_URL", "http://localhost:7997")
+ONNX_MODEL_PATH = os.getenv("RAG_ONNX_MODEL_PATH", "bge-m3-int8.onnx")
+RETRIEVAL_CACHE_SIZE = 512
+# Per-call LLM output caps - chat answers are 2-4 paragraphs, greetings 2-3 sentences
+CHAT_MAX_TOKENS = 800
+GREETING_MAX_TOKENS = 200
+# Characters of each source chunk returned as its snippet
+SNIPPET_LENGTH = 250
+# Chat history sent to the LLM: most recent messages within this many tokens
+HISTORY_TOKEN_BUDGET = 2000
+# HNSW settings for newly built collections - sized for the small careers
+# corpus (a few thousand chunks) and k=3 retrieval
+HNSW_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": 24,
+    "hnsw:construction_ef": 200,
+    "hnsw:search_ef": 48
+}
+# Default collection name used by langchain_chroma, so DBs built here and
+# DBs built with Chroma.from_documents load the same way
+COLLECTION_NAME = "langchain"
+
+# System prompt for every chat turn (filled with {language} and {context})
+SYSTEM_TEMPLATE = """You are a helpful and friendly multilingual career guidance assistant for Indian students aged 13-15.
+
+            LANGUAGE INSTRUCTION:
+            You MUST respond in this language: {language}
+            - If the user's input is not in {language}, translate internally as needed.
+            - All final answers MUST be in {language}.
+
+            When answering questions about careers, education paths, or professional guidance:
+            - Keep responses SHORT and CONCISE (2-4 paragraphs maximum)
+            - Prioritize information from the Context provided below
+            - Use the context to give detailed, specific answers
+            - If the context has relevant information, base your answer primarily on it
+            - If the context doesn't have the information, you can provide general career guidance relevant to India
+            - If the question is unrelated to career guidance/education/careers, politely inform the user that you can only assist with career-related queries
+            - Keep responses age-appropriate, encouraging, and culturally sensitive
+
+            Context:
+            {context}"""
+
+
+# Process-wide embedding models and Chroma handles, see RAGChatService.__init__
+_embedding_cache: Dict[tuple, Embeddings] = {}
+_chroma_cache: Dict[tuple, Chroma] = {}
+_resource_lock = threading.Lock()
+# Formats sources off the streaming path in chat_stream(), shared by every
+# instance so a repeated 'initialize' doesn't leave idle pools behind
+_sources_pool = ThreadPoolExecutor(max_workers=1)
+
+
+def _dir_nonempty(path: str) -> bool:
+    """Check for any entry in a directory without listing all of them"""
+    try:
+        with os.scandir(path) as it:
+            return next(it, None) is not None
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def _history_tokenizer():
+    """
+    Tokenizer used to count chat history tokens - bge-m3's multilingual
+    tokenizer, a close enough proxy for the LLM's on Indian-language text
+    """
+    from tokenizers import Tokenizer
+    return Tokenizer.from_pretrained(EMBEDDING_MODEL)
+
+
+class ORTEmbeddings(Embeddings):
+    """
+    bge-m3 embeddings from an int8-quantized ONNX model, run with onnxruntime
+
+    Build the model once with:
+        optimum-cli export onnx --model BAAI/bge-m3 --optimize O3 bge-m3-onnx/
+        python -c "from onnxruntime.quantization import quantize_dynamic, QuantType; \
+            quantize_dynamic('bge-m3-onnx/model.onnx', 'bge-m3-int8.onnx', weight_type=QuantType.QInt8)"
+    """
+
+    def __init__(self, model_path: str, tokenizer_name: str = EMBEDDING_MODEL, max_length: int = EMBEDDING_MAX_TOKENS):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        so = ort.SessionOptions()
+        so.intra_op_num_threads = os.cpu_count() or 1
+        self.session = ort.InferenceSession(
+            model_path, sess_options=so, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        # Fast Rust tokenizer, padded per batch with XLM-R's <pad> (id 1 -
+        # the default id 0 is <s>)
+        self.tokenizer = Tokenizer.from_pretrained(tokenizer_name)
+        self.tokenizer.enable_truncation(max_length)
+        self.tokenizer.enable_padding(
+            pad_id=self.tokenizer.token_to_id("<pad>"), pad_token="<pad>")
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        embeddings = []
+        for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+            encoded = self.tokenizer.encode_batch(
+                texts[start:start + EMBEDDING_BATCH_SIZE])
+            input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+            feeds = {
+                "input_ids": input_ids,
+                "attention_mask": np.array([e.attention_mask for e in encoded], dtype=np.int64)
+            }
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+            hidden = self.session.run(None, feeds)[0]
+            # bge-m3 dense embeddings use CLS pooling + L2 normalization,
+            # matching the sentence-transformers model behind HuggingFaceEmbeddings
+            x = hidden[:, 0]
+            x /= np.linalg.norm(x, axis=1, keepdims=True)
+            embeddings.extend(x.tolist())
+        return embeddings
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text])[0]
+
+
+class CUDAEmbeddings(Embeddings):
+    """
+    bge-m3 embeddings on GPU: sentence-transformers in FP16 with the
+    transformer forward compiled by torch.compile (used by the huggingface
+    backend when CUDA is available)
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL, batch_size: int = EMBEDDING_BATCH_SIZE):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cuda").half()
+        # dynamic=True so varying batch/sequence lengths don't each recompile.
+        # Default mode, not "reduce-overhead": its CUDA graphs are recorded per
+        # input shape (every query length) and per thread (the server embeds
+        # from arbitrary worker threads), so they would pile up.
+        self.model[0].auto_model = torch.compile(
+            self.model[0].auto_model, dynamic=True)
+        self.batch_size = batch_size
+
+        # Compile now rather than on the first real request
+        self.embed_query("warm up")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.model.encode(
+            texts, batch_size=self.batch_size, convert_to_numpy=True,
+            normalize_embeddings=True).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
 
 
 class RAGChatService:
+    # Conversational RAG prompt, compiled once and rendered per turn in chat()
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", SYSTEM_TEMPLATE),
+        MessagesPlaceholder("chat_history"),
+        ("human", "{question}")
+    ])
+
     def __init__(self, careers_json_path: str, chroma_persist_dir: str, provider: str = "google"):
         """
         Initialize the RAG Chat Service
@@ -62,25 +248,40 @@ class RAGChatService:
         #     model_name="sentence-transformers/all-mpnet-base-v2"
         # )
 
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="BAAI/bge-m3"
-        )
-
-        # Initialize or load vector database
-        self.vectordb = self._init_vectordb()
-
-        # Initialize LLM
+        # Embeddings and vector DB are shared by every instance in the process,
+        # so a repeated 'initialize' doesn't reload the model or reopen Chroma.
+        # Loading under the lock keeps concurrent initializers from both loading.
+        embeddings_key = (EMBEDDINGS_BACKEND, EMBEDDING_MODEL)
+        vectordb_key = (embeddings_key, os.path.abspath(chroma_persist_dir))
+        with _resource_lock:
+            self.embeddings = _embedding_cache.get(embeddings_key)
+            if self.embeddings is None:
+                self.embeddings = self._init_embeddings()
+                _embedding_cache[embeddings_key] = self.embeddings
+
+            # Initialize or load vector database
+            self.vectordb = _chroma_cache.get(vectordb_key)
+            if self.vectordb is None:
+                self.vectordb = self._init_vectordb()
+                _chroma_cache[vectordb_key] = self.vectordb
+
+        # Initialize LLM (output length is capped per call, see _capped_llm)
         self.llm = self._init_llm()
+        self._capped_llms: Dict[int, Any] = {}
 
         # Initialize retriever
         self.retriever = self.vectordb.as_retriever(search_kwargs={"k": 3})
-
-        # Build the chain
-        self.chain = self._build_chain()
+        # LRU of retrieval results keyed by a hash of the normalized message
+        # (locked, since the server runs retrievals in worker threads)
+        self._retrieval_cache: "OrderedDict[bytes, List[Document]]" = OrderedDict()
+        self._retrieval_lock = threading.Lock()
+        # Counts chat history tokens - loaded here (once per process) rather
+        # than on the first chat
+        self.history_tokenizer = _history_tokenizer()
 
     def _init_vectordb(self) -> Chroma:
         """Initialize or load Chroma vector database"""
-        if os.path.exists(self.chroma_persist_dir) and os.listdir(self.chroma_persist_dir):
+        if _dir_nonempty(self.chroma_persist_dir):
             print(
                 f"Loading existing Chroma DB from {self.chroma_persist_dir}", file=sys.stderr)
             return Chroma(
@@ -92,37 +293,127 @@ class RAGChatService:
                 f"Creating new Chroma DB at {self.chroma_persist_dir}", file=sys.stderr)
             items = self._load_json(self.careers_json_path)
             docs = self._json_to_docs(items)
-            return Chroma.from_documents(
-                documents=docs,
-                embedding=self.embeddings,
-                persist_directory=self.chroma_persist_dir
+
+            texts = [doc.page_content for doc in docs]
+            metadatas = [doc.metadata for doc in docs]
+            ids = [f"{m['source_id']}:{m['chunk_index']}" for m in metadatas]
+
+            # Embed every chunk in one batched pass, then insert the vectors
+            # directly through the Chroma client
+            embeddings = self._embed_documents_cached(texts)
+
+            client = chromadb.PersistentClient(path=self.chroma_persist_dir)
+            collection = client.get_or_create_collection(
+                COLLECTION_NAME, metadata=HNSW_METADATA)
+            batch_size = min(CHROMA_ADD_BATCH_SIZE, client.get_max_batch_size())
+            for start in range(0, len(texts), batch_size):
+                end = start + batch_size
+                collection.add(
+                    ids=ids[start:end],
+                    embeddings=embeddings[start:end],
+                    documents=texts[start:end],
+                    metadatas=metadatas[start:end]
+                )
+
+            return Chroma(
+                client=client,
+                collection_name=COLLECTION_NAME,
+                embedding_function=self.embeddings
+            )
+
+    def _init_embeddings(self):
+        """Initialize the embedding model based on EMBEDDINGS_BACKEND"""
+        if EMBEDDINGS_BACKEND == "infinity":
+            # Requires langchain-community and a running Infinity server
+            from langchain_community.embeddings import InfinityEmbeddings
+            return InfinityEmbeddings(
+                model=EMBEDDING_MODEL,
+                infinity_api_url=INFINITY_API_URL
+            )
+        elif EMBEDDINGS_BACKEND == "onnx":
+            # Requires onnxruntime and a quantized model (see ORTEmbeddings)
+            return ORTEmbeddings(ONNX_MODEL_PATH)
+        elif EMBEDDINGS_BACKEND == "huggingface":
+            import torch
+            if torch.cuda.is_available():
+                return CUDAEmbeddings()
+            return HuggingFaceEmbeddings(
+                model_name=EMBEDDING_MODEL,
+                encode_kwargs={"batch_size": EMBEDDING_BATCH_SIZE}
+            )
+        else:
+            raise ValueError(
+                f"Unknown embeddings backend: {EMBEDDINGS_BACKEND}")
+
+    def _embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed document chunks for ingestion"""
+        if EMBEDDINGS_BACKEND == "infinity":
+            # Send all requests concurrently so Infinity's scheduler can
+            # coalesce them into large GPU batches
+            return asyncio.run(self.embeddings.aembed_documents(texts))
+        return self.embeddings.embed_documents(texts)
+
+    def _embed_documents_cached(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed document chunks, reusing vectors from the on-disk embedding cache
+
+        The cache lives next to the Chroma directory (so it survives deleting
+        the DB for a rebuild) and maps sha256(backend, model, chunk text) to
+        the chunk's embedding. Only chunks missing from it are embedded.
+        """
+        cache_path = Path(
+            f"{str(self.chroma_persist_dir).rstrip('/')}_emb_cache.npz")
+        cache: Dict[str, np.ndarray] = {}
+        if cache_path.exists():
+            try:
+                with np.load(cache_path) as data:
+                    cache = dict(zip(data["keys"].tolist(), data["embeddings"]))
+            except (OSError, KeyError, ValueError) as e:
+                print(f"Ignoring unreadable embedding cache: {e}", file=sys.stderr)
+
+        prefix = f"{EMBEDDINGS_BACKEND}|{EMBEDDING_MODEL}|"
+        keys = [hashlib.sha256((prefix + t).encode("utf-8")).hexdigest()
+                for t in texts]
+        missing = [i for i, k in enumerate(keys) if k not in cache]
+        print(f"Embedding {len(missing)} of {len(texts)} chunks "
+              f"({len(texts) - len(missing)} cached)", file=sys.stderr)
+
+        if missing:
+            new_embeddings = self._embed_documents([texts[i] for i in missing])
+            for i, emb in zip(missing, new_embeddings):
+                cache[keys[i]] = np.asarray(emb, dtype=np.float32)
+
+            # Keep only the current corpus so the cache doesn't grow forever
+            np.savez_compressed(
+                cache_path,
+                keys=np.array(keys),
+                embeddings=np.stack([cache[k] for k in keys])
             )
 
+        return [cache[k].tolist() for k in keys]
+
     def _load_json(self, path: str) -> List[Dict]:
-        """Load careers JSON file with proper UTF-8 encoding"""
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        """Load careers JSON file (msgspec decodes the UTF-8 bytes directly)"""
+        return msgspec.json.decode(Path(path).read_bytes())
 
     def _json_to_docs(self, items: List[Dict]) -> List[Document]:
         """Convert JSON items to Document chunks"""
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=CHUNK_SIZE,
-            chunk_overlap=CHUNK_OVERLAP,
-            separators=["\n\n", "\n", " ", ""],
-        )
+        # Rust splitter; chunk_all splits every item in parallel off the GIL
+        splitter = TextSplitter(capacity=CHUNK_SIZE, overlap=CHUNK_OVERLAP)
+        chunks_per_item = splitter.chunk_all(
+            [f"{item['title']}\n\n{item['content']}" for item in items])
 
         docs = []
-        for item in items:
-            combined = f"{item['title']}\n\n{item['content']}"
-            chunks = splitter.split_text(combined)
-
+        for item, chunks in zip(items, chunks_per_item):
             for i, ch in enumerate(chunks):
                 docs.append(Document(
                     page_content=ch,
                     metadata={
                         "source_id": item["id"],
                         "title": item["title"],
-                        "chunk_index": i
+                        "chunk_index": i,
+                        # Precomputed for _format_sources
+                        "snippet": ch[:SNIPPET_LENGTH]
                     }
                 ))
         return docs
@@ -133,76 +424,140 @@ class RAGChatService:
             from langchain_groq import ChatGroq
             return ChatGroq(
                 model="llama-3.3-70b-versatile",
-                temperature=0.1,
-                max_tokens=1500
+                temperature=0.1
             )
         elif self.provider == "google":
             from langchain_google_genai import ChatGoogleGenerativeAI
             # Use gemini-2.5-flash instead of gemini-2.5-pro for better free tier limits
             # Flash has 15 requests/minute vs Pro's 2 requests/minute on free tier
+            # Thinking tokens count against max_output_tokens on 2.5 models,
+            # so with thinking on the per-call caps (see _capped_llm) could be
+            # used up before any answer text - a 200-token greeting came back
+            # empty. The answers are short and grounded in retrieved context.
             return ChatGoogleGenerativeAI(
                 model="gemini-2.5-flash",
                 temperature=0.1,
-                max_output_tokens=1500
+                thinking_budget=0
             )
         else:
             raise ValueError(f"Unknown provider: {self.provider}")
 
-    def _build_chain(self):
-        """Build the conversational RAG chain"""
-        prompt = ChatPromptTemplate.from_messages([
-            ("system",
-             """You are a helpful and friendly multilingual career guidance assistant for Indian students aged 13-15.
-
-            LANGUAGE INSTRUCTION:
-            You MUST respond in this language: {language}
-            - If the user's input is not in {language}, translate internally as needed.
-            - All final answers MUST be in {language}.
+    def _capped_llm(self, max_tokens: int):
+        """
+        The LLM bound to an output token cap (Gemini and Groq name it
+        differently). The whole cap goes to answer text: Gemini runs with
+        thinking disabled, see _init_llm.
+        """
+        llm = self._capped_llms.get(max_tokens)
+        if llm is None:
+            if self.provider == "google":
+                llm = self.llm.bind(
+                    generation_config={"max_output_tokens": max_tokens})
+            else:
+                llm = self.llm.bind(max_tokens=max_tokens)
+            self._capped_llms[max_tokens] = llm
+        return llm
+
+    @staticmethod
+    def _format_docs(docs: List[Document]) -> str:
+        """Format retrieved documents into the prompt context"""
+        if not docs:
+            return "No relevant information found."
+        return "\n\n---\n\n".join(
+            f"[Source {i}: {doc.metadata.get('title', 'Unknown')}]\n{doc.page_content}"
+            for i, doc in enumerate(docs, 1))
+
+    def _retrieve(self, message: str) -> List[Document]:
+        """Retrieve documents for a message, served from the LRU cache on repeats"""
+        key = hashlib.blake2b(
+            message.strip().lower().encode("utf-8"), digest_size=16).digest()
+        with self._retrieval_lock:
+            docs = self._retrieval_cache.get(key)
+            if docs is not None:
+                self._retrieval_cache.move_to_end(key)
+                return docs
+
+        docs = self.retriever.invoke(message)
+        with self._retrieval_lock:
+            self._retrieval_cache[key] = docs
+            if len(self._retrieval_cache) > RETRIEVAL_CACHE_SIZE:
+                self._retrieval_cache.popitem(last=False)
+        return docs
 
-            When answering questions about careers, education paths, or professional guidance:
-            - Keep responses SHORT and CONCISE (2-4 paragraphs maximum)
-            - Prioritize information from the Context provided below
-            - Use the context to give detailed, specific answers
-            - If the context has relevant information, base your answer primarily on it
-            - If the context doesn't have the information, you can provide general career guidance relevant to India
-            - If the question is unrelated to career guidance/education/careers, politely inform the user that you can only assist with career-related queries
-            - Keep responses age-appropriate, encouraging, and culturally sensitive
+    def _build_history(self, chat_history: List[Dict]) -> List:
+        """
+        Convert chat history to LangChain format
+        This preserves all Unicode characters from previous conversations
 
-            Context:
-            {context}"""),
-            MessagesPlaceholder("chat_history"),
-            ("human", "{question}")
-        ])
-
-        def format_docs(docs):
-            if not docs:
-                return "No relevant information found."
-            formatted = []
-            for i, doc in enumerate(docs, 1):
-                formatted.append(
-                    f"[Source {i}: {doc.metadata.get('title', 'Unknown')}]\n{doc.page_content}")
-            return "\n\n---\n\n".join(formatted)
-
-        def get_context(inputs):
-            question = inputs["question"]
-            docs = self.retriever.invoke(question)
-            return format_docs(docs)
-
-        chain = (
-            {
-                "context": get_context,
-                "question": lambda x: x["question"],
-                "language": lambda x: x.get("language", "en"),
-                "chat_history": lambda x: x.get("chat_history", [])
-            }
-            | prompt
-            | self.llm
-            | StrOutputParser()
+        Keeps the most recent messages that fit in HISTORY_TOKEN_BUDGET, so
+        long Hindi/Telugu replies don't inflate the prompt
+        """
+        tokenizer = self.history_tokenizer
+        budget = HISTORY_TOKEN_BUDGET
+        lc_history = []
+        for msg in reversed(chat_history):
+            content = msg.get("content", "")
+            # Ensure content is properly decoded string
+            if not isinstance(content, str):
+                content = str(content)
+
+            if msg["role"] == "user":
+                message_cls = HumanMessage
+            elif msg["role"] == "assistant":
+                message_cls = AIMessage
+            else:
+                continue
+
+            budget -= len(tokenizer.encode(content, add_special_tokens=False))
+            if budget < 0:
+                break
+            lc_history.append(message_cls(content=content))
+
+        lc_history.reverse()
+        return lc_history
+
+    def _prepare(self, message: str, chat_history: List[Dict]) -> Tuple[str, List, List[Document]]:
+        """Message, trimmed LangChain history and retrieved documents for a chat turn"""
+        # Verify message encoding (defensive check)
+        if not isinstance(message, str):
+            message = str(message)
+        return message, self._build_history(chat_history), self._retrieve(message)
+
+    def _build_messages(self, message: str, docs: List[Document], lc_history: List, language: str) -> List:
+        """Render the prompt - LLM will respond in specified language"""
+        return self.prompt.format_messages(
+            context=self._format_docs(docs),
+            question=message,
+            chat_history=lc_history,
+            language=language
         )
 
-        return chain
-
-    def chat(self, message: str, chat_history: List[Dict], language: str = "en") -> Dict:
+    @staticmethod
+    def _format_sources(docs: List[Document]) -> List[Dict]:
+        """Format the retrieved documents as sources for the response"""
+        sources = []
+        for doc in docs[:4]:  # Top 4 sources
+            sources.append({
+                "title": doc.metadata.get("title", "Unknown"),
+                "chunk_index": doc.metadata.get("chunk_index", 0),
+                # DBs built before snippets were stored fall back to slicing
+                "snippet": doc.metadata.get("snippet") or doc.page_content[:SNIPPET_LENGTH]
+            })
+        return sources
+
+    @staticmethod
+    def _error_result(error: Exception) -> Dict:
+        """The data a failed chat returns"""
+        error_msg = str(error)
+        print(f"Error in chat: {error_msg}", file=sys.stderr)
+        return {
+            "response": None,
+            "sources": [],
+            "error": error_msg
+        }
+
+    def chat(self, message: str, chat_history: List[Dict], language: str = "en",
+             max_tokens: int = CHAT_MAX_TOKENS) -> Dict:
         """
         Process a chat message and return a response
         Handles full multilingual flow including Hindi, Telugu, etc.
@@ -212,92 +567,138 @@ class RAGChatService:
             chat_history: List of previous messages in format [{"role": "user"|"assistant", "content": "..."}]
                          All content fields can contain multilingual text
             language: Language code (en, hi, te, ta, bn, gu)
+            max_tokens: Cap on the LLM's output tokens
 
         Returns:
             Dict with 'response' and 'sources'
         """
         try:
-            # Verify message encoding (defensive check)
-            if not isinstance(message, str):
-                message = str(message)
-            
-            # Convert chat history to LangChain format
-            # This preserves all Unicode characters from previous conversations
-            lc_history = []
-            for msg in chat_history[-10:]:  # Keep last 10 messages for context
-                content = msg.get("content", "")
-                # Ensure content is properly decoded string
-                if not isinstance(content, str):
-                    content = str(content)
-                    
-                if msg["role"] == "user":
-                    lc_history.append(HumanMessage(content=content))
-                elif msg["role"] == "assistant":
-                    lc_history.append(AIMessage(content=content))
-
-            # Get relevant documents
-            docs = self.retriever.invoke(message)
-
-            # Generate response - LLM will respond in specified language
-            response = self.chain.invoke({
-                "question": message,
-                "chat_history": lc_history,
-                "language": language
-            })
-
-            # Verify response is string (should contain Hindi/Telugu if input was)
-            if not isinstance(response, str):
-                response = str(response)
+            # Trimmed history and relevant documents
+            message, lc_history, docs = self._prepare(message, chat_history)
 
-            # Format sources
-            sources = []
-            for doc in docs[:4]:  # Top 4 sources
-                sources.append({
-                    "title": doc.metadata.get("title", "Unknown"),
-                    "chunk_index": doc.metadata.get("chunk_index", 0),
-                    "snippet": doc.page_content[:250]
-                })
+            # Generate response
+            # (.text is a str subclass that msgspec can't encode - take a plain str)
+            response = str(self._capped_llm(max_tokens).invoke(
+                self._build_messages(message, docs, lc_history, language)).text)
 
             return {
                 "response": response,
-                "sources": sources,
+                "sources": self._format_sources(docs),
                 "error": None
             }
 
         except Exception as e:
-            error_msg = str(e)
-            print(f"Error in chat: {error_msg}", file=sys.stderr)
-            return {
-                "response": None,
-                "sources": [],
-                "error": error_msg
-            }
+            return self._error_result(e)
 
-    def generate_initial_greeting(self, assessment_summary: str, language: str = "en") -> Dict:
+    def chat_stream(self, message: str, chat_history: List[Dict], language: str = "en",
+                    max_tokens: int = CHAT_MAX_TOKENS) -> Iterator[Dict]:
         """
-        Generate an initial greeting based on assessment results
+        Streaming version of chat(): yields {"status": "stream", "delta": ...}
+        frames as LLM tokens arrive, then one {"status": "success", "data": ...}
+        frame with the same data chat() returns (response is the full text)
+        """
+        try:
+            message, lc_history, docs = self._prepare(message, chat_history)
+
+            # Build the sources in the background while tokens stream
+            sources = _sources_pool.submit(self._format_sources, docs)
+
+            parts = []
+            for chunk in self._capped_llm(max_tokens).stream(
+                    self._build_messages(message, docs, lc_history, language)):
+                delta = str(chunk.text)  # plain str, see chat()
+                if delta:
+                    parts.append(delta)
+                    yield {"status": "stream", "delta": delta}
+
+            data = {
+                "response": "".join(parts),
+                "sources": sources.result(),
+                "error": None
+            }
 
-        Args:
-            assessment_summary: Summary of the assessment results
-            language: Language code (currently only 'en' is fully supported)
+        except Exception as e:
+            data = self._error_result(e)
+
+        yield {"status": "success", "data": data}
+
+    async def achat_stream(self, message: str, chat_history: List[Dict], language: str = "en",
+                           max_tokens: int = CHAT_MAX_TOKENS) -> AsyncIterator[Dict]:
+        """Async version of chat_stream() used by the persistent server"""
+        try:
+            message, lc_history, docs = await asyncio.to_thread(
+                self._prepare, message, chat_history)
+            sources = asyncio.create_task(
+                asyncio.to_thread(self._format_sources, docs))
+
+            parts = []
+            async for chunk in self._capped_llm(max_tokens).astream(
+                    self._build_messages(message, docs, lc_history, language)):
+                delta = str(chunk.text)  # plain str, see chat()
+                if delta:
+                    parts.append(delta)
+                    yield {"status": "stream", "delta": delta}
+
+            data = {
+                "response": "".join(parts),
+                "sources": await sources,
+                "error": None
+            }
+
+        except Exception as e:
+            data = self._error_result(e)
+
+        yield {"status": "success", "data": data}
+
+    async def achat(self, message: str, chat_history: List[Dict], language: str = "en",
+                    max_tokens: int = CHAT_MAX_TOKENS) -> Dict:
+        """
+        Async version of chat() used by the persistent server (rag_server.py)
+        The LLM call yields the event loop, so concurrent chats overlap their
+        network wait instead of queueing behind each other
 
         Returns:
             Dict with 'response' and 'sources'
         """
         try:
-            # Language-specific instructions
-            lang_instructions = {
-                "en": "Generate in English",
-                "hi": "Generate in Hindi (हिंदी में जवाब दें)",
-                "te": "Generate in Telugu (తెలుగులో సమాధానం ఇవ్వండి)",
-                "ta": "Generate in Tamil (தமிழில் பதிலளிக்கவும்)",
-                "mr": "Generate in Marathi (मराठीत उत्तर द्या)",
-                "bn": "Generate in Bengali (বাংলায় উত্তর দিন)"
+            # History tokenization, embedding and HNSW search are blocking
+            # work - keep them off the event loop
+            message, lc_history, docs = await asyncio.to_thread(
+                self._prepare, message, chat_history)
+
+            # Format the sources while the LLM request is in flight
+            llm_response, sources = await asyncio.gather(
+                self._capped_llm(max_tokens).ainvoke(
+                    self._build_messages(message, docs, lc_history, language)),
+                asyncio.to_thread(self._format_sources, docs)
+            )
+            response = str(llm_response.text)
+
+            return {
+                "response": response,
+                "sources": sources,
+                "error": None
             }
-            
-            lang_instruction = lang_instructions.get(language, "Generate in English")
 
-            greeting_prompt = f"""Based on this student's assessment results, generate a warm, encouraging greeting that:
+        except Exception as e:
+            return self._error_result(e)
+
+    @staticmethod
+    def _greeting_prompt(assessment_summary: str, language: str) -> str:
+        """Build the greeting request sent through chat()"""
+        # Language-specific instructions
+        lang_instructions = {
+            "en": "Generate in English",
+            "hi": "Generate in Hindi (हिंदी में जवाब दें)",
+            "te": "Generate in Telugu (తెలుగులో సమాధానం ఇవ్వండి)",
+            "ta": "Generate in Tamil (தமிழில் பதிலளிக்கவும்)",
+            "mr": "Generate in Marathi (मराठीत उत्तर द्या)",
+            "bn": "Generate in Bengali (বাংলায় উত্তর দিন)"
+        }
+
+        lang_instruction = lang_instructions.get(language, "Generate in English")
+
+        return f"""Based on this student's assessment results, generate a warm, encouraging greeting that:
 1. Welcomes them to the career guidance chat
 2. Briefly acknowledges their assessment results
 3. Invites them to ask questions about their career recommendations
@@ -310,22 +711,67 @@ Assessment Summary:
 
 Keep the greeting concise (2-3 sentences) and friendly."""
 
-            result = self.chat(greeting_prompt, [], language)
-            return result
+    @staticmethod
+    def _greeting_fallback(error: Exception) -> Dict:
+        print(f"Error generating initial greeting: {str(error)}", file=sys.stderr)
+        return {
+            "response": f"Hello! I'm your career guidance assistant. I'm here to help you explore your career options based on your assessment results. What would you like to know?",
+            "sources": [],
+            "error": str(error)
+        }
+
+    def generate_initial_greeting(self, assessment_summary: str, language: str = "en") -> Dict:
+        """
+        Generate an initial greeting based on assessment results
+
+        Args:
+            assessment_summary: Summary of the assessment results
+            language: Language code (currently only 'en' is fully supported)
+
+        Returns:
+            Dict with 'response' and 'sources'
+        """
+        try:
+            return self.chat(
+                self._greeting_prompt(assessment_summary, language), [], language,
+                max_tokens=GREETING_MAX_TOKENS)
+        except Exception as e:
+            return self._greeting_fallback(e)
 
+    async def agenerate_initial_greeting(self, assessment_summary: str, language: str = "en") -> Dict:
+        """Async version of generate_initial_greeting() used by the persistent server"""
+        try:
+            return await self.achat(
+                self._greeting_prompt(assessment_summary, language), [], language,
+                max_tokens=GREETING_MAX_TOKENS)
         except Exception as e:
-            print(
-                f"Error generating initial greeting: {str(e)}", file=sys.stderr)
-            return {
-                "response": f"Hello! I'm your career guidance assistant. I'm here to help you explore your career options based on your assessment results. What would you like to know?",
-                "sources": [],
-                "error": str(e)
-            }
+            return self._greeting_fallback(e)
+
+
+class Command(msgspec.Struct):
+    """A single JSON command from Node.js (one per stdin line)"""
+    command: str
+    # initialize
+    careers_json_path: Optional[str] = None
+    chroma_persist_dir: Optional[str] = None
+    provider: str = "google"
+    # chat
+    message: str = ""
+    chat_history: List[Dict[str, Any]] = msgspec.field(default_factory=list)
+    stream: bool = False
+    # greeting
+    assessment_summary: str = ""
+    # chat / greeting
+    language: str = "en"
+
+
+_command_decoder = msgspec.json.Decoder(Command)
+_json_encoder = msgspec.json.Encoder()
 
 
 def safe_json_dumps(obj):
-    """Safely serialize JSON with proper UTF-8 encoding"""
-    return json.dumps(obj, ensure_ascii=False, indent=None)
+    """Safely serialize JSON with proper UTF-8 encoding (non-ASCII is not escaped)"""
+    return _json_encoder.encode(obj).decode("utf-8")
 
 
 def main():
@@ -336,25 +782,22 @@ def main():
     # Global service instance
     rag_service = None
 
-    # Read all input lines
-    for line in sys.stdin:
+    # Read raw UTF-8 lines; msgspec decodes bytes directly
+    for line in iter(sys.stdin.buffer.readline, b""):
         line = line.strip()
         if not line:
             continue
 
         try:
-            input_data = json.loads(line)
-            command = input_data.get("command")
+            input_data = _command_decoder.decode(line)
+            command = input_data.command
 
             if command == "initialize":
-                # Initialize the service
-                careers_json = input_data.get("careers_json_path")
-                chroma_dir = input_data.get("chroma_persist_dir")
-                provider = input_data.get("provider", "google")
-
                 # Create service instance
                 rag_service = RAGChatService(
-                    careers_json, chroma_dir, provider)
+                    input_data.careers_json_path,
+                    input_data.chroma_persist_dir,
+                    input_data.provider)
 
                 print(safe_json_dumps({
                     "status": "success",
@@ -362,30 +805,31 @@ def main():
                 }), flush=True)
 
             elif command == "chat":
-                message = input_data.get("message")
-                chat_history = input_data.get("chat_history", [])
-                language = input_data.get("language", "en")
-
                 if rag_service is None:
                     raise Exception(
                         "Service not initialized. Call 'initialize' first.")
 
-                result = rag_service.chat(message, chat_history, language)
+                if input_data.stream:
+                    # NDJSON frames: "stream" deltas, then the final "success"
+                    for frame in rag_service.chat_stream(
+                            input_data.message, input_data.chat_history, input_data.language):
+                        print(safe_json_dumps(frame), flush=True)
+                    continue
+
+                result = rag_service.chat(
+                    input_data.message, input_data.chat_history, input_data.language)
                 print(safe_json_dumps({
                     "status": "success",
                     "data": result
                 }), flush=True)
 
             elif command == "greeting":
-                assessment_summary = input_data.get("assessment_summary")
-                language = input_data.get("language", "en")
-
                 if rag_service is None:
                     raise Exception(
                         "Service not initialized. Call 'initialize' first.")
 
                 result = rag_service.generate_initial_greeting(
-                    assessment_summary, language)
+                    input_data.assessment_summary, input_data.language)
                 print(safe_json_dumps({
                     "status": "success",
                     "data": result
@@ -0,0 +1,64 @@
+"""
+Round-trip check for the stdio protocol: chat, streaming chat and greeting
+replies must encode with safe_json_dumps (run from the backend directory: npm run test:rag)
+
+Uses a fake LLM and retriever, so no model download or API key is needed.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src" / "services"))
+
+import msgspec
+from langchain_core.documents import Document
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from rag_service import RAGChatService, safe_json_dumps
+
+
+def make_service() -> RAGChatService:
+    """A RAGChatService with a canned LLM reply and one retrieved document"""
+    service = RAGChatService.__new__(RAGChatService)
+    service.provider = "groq"
+    service.llm = FakeListChatModel(responses=["डॉक्टर मरीजों का इलाज करते हैं।"])
+    service._capped_llms = {}
+    service.history_tokenizer = None  # only used for non-empty history
+    service._retrieve = lambda message: [Document(
+        page_content="Doctors diagnose and treat patients.",
+        metadata={"title": "Doctor", "chunk_index": 0})]
+    return service
+
+
+def check_round_trip(name: str, data: dict):
+    assert data["error"] is None, f"{name}: {data['error']}"
+    assert msgspec.json.decode(safe_json_dumps(data)) == data, name
+    print(f"{name}: ok")
+
+
+async def collect(frames) -> list:
+    return [frame async for frame in frames]
+
+
+def check_stream(name: str, frames: list):
+    *deltas, final = frames
+    assert deltas and all(f["status"] == "stream" for f in deltas), name
+    for frame in deltas:
+        assert msgspec.json.decode(safe_json_dumps(frame)) == frame, name
+    check_round_trip(name, final["data"])
+
+
+def main():
+    service = make_service()
+    check_round_trip("chat", service.chat("डॉक्टर क्या करते हैं?", [], "hi"))
+    check_round_trip("achat", asyncio.run(
+        service.achat("What does a doctor do?", [], "en")))
+    check_stream("chat_stream", list(service.chat_stream("What does a doctor do?", [])))
+    check_stream("achat_stream", asyncio.run(
+        collect(service.achat_stream("What does a doctor do?", []))))
+    check_round_trip("greeting", service.generate_initial_greeting(
+        "Top RIASEC types: I, S, A", "en"))
+
+
+if __name__ == "__main__":
+    main()
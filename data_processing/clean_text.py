@@ -1,48 +1,74 @@
 import re
 
-def clean_pdf_text(text):
-    # --- Remove page markers like: --- Page 51 ---
-    text = re.sub(r'-{2,}\s*Page\s*\d+\s*-{2,}', ' ', text, flags=re.IGNORECASE)
-
-    # --- Remove timestamps (with or without seconds) ---
-    text = re.sub(r'\d{1,2}-[A-Za-z]{3}-\d{2}\s+\d{1,2}:\d{2}(:\d{2})?\s*[APMapm]{2}', ' ', text)
-
-    # --- Remove PDF header/footer garbage like: ---
-    # Career Guidance Book Vol-2_Engineering_1-96.indd 27
-    # ...Vol-3 - Research and Development_335-408.indd_ 342
-    text = re.sub(r'Career Guidance Book.*?indd[_\s-]*\d{1,4}', ' ', text, flags=re.IGNORECASE)
+# --- Cleaning patterns, compiled once ---
+# Page markers like: --- Page 51 ---
+_PAGE_MARKER = re.compile(r'-{2,}\s*Page\s*\d+\s*-{2,}', re.IGNORECASE)
+# Timestamps (with or without seconds)
+_TIMESTAMP = re.compile(r'\d{1,2}-[A-Za-z]{3}-\d{2}\s+\d{1,2}:\d{2}(:\d{2})?\s*[APMapm]{2}')
+# PDF header/footer garbage like:
+# Career Guidance Book Vol-2_Engineering_1-96.indd 27
+# ...Vol-3 - Research and Development_335-408.indd_ 342
+_HEADER = re.compile(r'Career Guidance Book.*?indd[_\s-]*\d{1,4}', re.IGNORECASE)
+# Page-number and bullet leftovers, removed in one pass:
+# lines containing only numbers (page numbers), standalone page numbers
+# (e.g., "66 |") and leftover bullets, pipes, dots
+_COMBINED = re.compile(r'^\s*\d{1,4}\s*$|\b\d{1,4}\s*\||[|·•◦▪]+', re.MULTILINE)
 
-    # --- Remove standalone page numbers (e.g., "66 |") ---
-    text = re.sub(r'\b\d{1,4}\s*\|', ' ', text)
+# Stray unicode quotes and artifacts, fixed in a single pass
+_TRANS = str.maketrans({
+    '\u201c': '"', '\u201d': '"',   # curly double quotes
+    '\u2019': "'", '\u2018': "'",   # curly single quotes
+    '\u2014': ' ',                 # em-dash
+    '\u2013': ' ',                 # en-dash
+    '\xad': None,                  # soft hyphen
+})
 
-    # --- Remove lines containing only numbers (page numbers) ---
-    text = re.sub(r'^\s*\d{1,4}\s*$', ' ', text, flags=re.MULTILINE)
+def clean_pdf_text(text):
+    # --- Remove page markers, timestamps and header/footer garbage ---
+    text = _PAGE_MARKER.sub(' ', text)
+    text = _TIMESTAMP.sub(' ', text)
+    text = _HEADER.sub(' ', text)
 
-    # --- Remove leftover bullets, pipes, dots ---
-    text = re.sub(r'[|·•◦▪]+', ' ', text)
+    # --- Remove page numbers, number-only lines and leftover bullets ---
+    text = _COMBINED.sub(' ', text)
 
     # --- Remove stray unicode quotes and artifacts ---
-    text = text.replace('“', '"').replace('”', '"')
-    text = text.replace('’', "'").replace('‘', "'")
-    text = text.replace('—', ' ')   # em-dash
-    text = text.replace('–', ' ')   # en-dash
-    text = text.replace('­', '')    # soft hyphen
+    text = text.translate(_TRANS)
 
     # --- Remove unreadable unicode (OCR junk) ---
-    text = text.encode("ascii", errors="ignore").decode()
-
-    # --- Collapse weird spacing ---
-    text = re.sub(r'\s+', ' ', text)
+    # (isascii() is O(1) - skip the round-trip when there is nothing to drop)
+    if not text.isascii():
+        text = text.encode("ascii", errors="ignore").decode()
 
-    return text.strip()
+    # --- Collapse weird spacing (split() also drops leading/trailing space) ---
+    return ' '.join(text.split())
 
-# Read the extracted text file
-with open("raw_text.txt", "r", encoding="utf-8") as f:
-    raw_text = f.read()
+# Text is cleaned in blocks of about this many characters, cut at line ends
+BLOCK_SIZE = 1 << 20
 
-# Clean the text
-cleaned_text = clean_pdf_text(raw_text)
+def read_line_blocks(f, block_size=BLOCK_SIZE):
+    """Yield blocks of roughly block_size characters that end on a newline"""
+    tail = ""
+    while True:
+        chunk = f.read(block_size)
+        if not chunk:
+            break
+        chunk = tail + chunk
+        cut = chunk.rfind("\n") + 1
+        tail = chunk[cut:]
+        if cut:
+            yield chunk[:cut]
+    if tail:
+        yield tail
 
-# Write the cleaned text to a new file
-with open("cleaned_text.txt", "w", encoding="utf-8") as f:
-    f.write(cleaned_text)
+# Clean the extracted text file block by block, writing each cleaned block
+# straight to the new file (blocks are joined by the single space that
+# whole-text cleaning would have collapsed the line break into)
+with open("raw_text.txt", "r", encoding="utf-8") as raw_file, \
+        open("cleaned_text.txt", "w", encoding="utf-8") as f:
+    separator = ""
+    for block in read_line_blocks(raw_file):
+        cleaned_block = clean_pdf_text(block)
+        if cleaned_block:
+            f.write(separator + cleaned_block)
+            separator = " "
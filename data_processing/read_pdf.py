@@ -1,25 +1,110 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pdf2image import convert_from_path
+from PIL import Image
 import pytesseract
 import os
+import threading
+# Pages are OCR'd in parallel, one tesseract instance per worker - keep each
+# single-threaded so they don't oversubscribe the cores. OpenMP reads this
+# once when it loads, so it must be set before tesserocr/paddle are imported.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+try:
+    from tesserocr import OEM, PSM, PyTessBaseAPI
+except ImportError:  # ocr_page falls back to one tesseract run per page
+    PyTessBaseAPI = None
+try:
+    import fitz  # PyMuPDF
+except ImportError:  # every page is OCR'd
+    fitz = None
+try:
+    import numpy as np
+    import paddle
+    from paddleocr import PaddleOCR
+except ImportError:  # CPU tesseract only
+    PaddleOCR = None
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+tessdata_path = r"C:\Program Files\Tesseract-OCR\tessdata"
 poppler_path = r"C:\Program Files\poppler-25.07.0\Library\bin"
 
 # Add Poppler to PATH at runtime
 os.environ["PATH"] += os.pathsep + poppler_path
 
-def ocr_pdf(pdf_path, start_page=25, end_page=608):
-    text = ""
-    # Convert only the required page range to images
-    images = convert_from_path(pdf_path, first_page=start_page, last_page=end_page)
-    for i, image in enumerate(images, start=start_page):
-        page_text = pytesseract.image_to_string(image, lang='eng')
-        text += f"\n--- Page {i} ---\n" + page_text
-        print(f"Processed page {i}")
-    return text
+# GPU OCR with PaddleOCR when it is installed and a CUDA device is present
+paddle_ocr = None
+if PaddleOCR is not None and paddle.device.cuda.device_count() > 0:
+    paddle_ocr = PaddleOCR(use_angle_cls=True, lang='en', use_gpu=True, show_log=False)
+
+# The GPU model is fed from a single thread
+OCR_WORKERS = 1 if paddle_ocr is not None else os.cpu_count() or 1
+# Pages rendered to images at a time, so only this many are held in memory
+PAGE_CHUNK_SIZE = 20
+# Render resolution for OCR, and tesseract settings for the book's plain
+# single-column pages: LSTM engine only (--oem 1), one uniform block of
+# text (--psm 6) instead of full automatic layout analysis
+OCR_DPI = 200
+TESSERACT_CONFIG = '--oem 1 --psm 6'
+# Pages with more embedded text than this are taken as-is, without OCR
+# (needs PyMuPDF)
+MIN_EMBEDDED_CHARS = 200
+
+# Per-thread tesserocr API, so the model is loaded once per worker instead
+# of once per page
+_thread_state = threading.local()
+
+def ocr_page(image):
+    if paddle_ocr is not None:
+        # One [box, (text, confidence)] entry per detected line, None if blank
+        lines = paddle_ocr.ocr(np.array(image), cls=True)[0] or []
+        return "\n".join(text for _, (text, _) in lines)
+    if PyTessBaseAPI is None:
+        return pytesseract.image_to_string(image, lang='eng', config=TESSERACT_CONFIG)
+    api = getattr(_thread_state, "api", None)
+    if api is None:
+        api = _thread_state.api = PyTessBaseAPI(path=tessdata_path, lang='eng',
+                                                psm=PSM.SINGLE_BLOCK, oem=OEM.LSTM_ONLY)
+    api.SetImage(image)
+    return api.GetUTF8Text()
+
+def render_page(doc, page_number):
+    # Rasterize straight from the open document - no pdftoppm process per page
+    pix = doc[page_number - 1].get_pixmap(dpi=OCR_DPI, colorspace=fitz.csGRAY)
+    return Image.frombytes("L", (pix.width, pix.height), pix.samples)
+
+def ocr_pdf(pdf_path, text_file, start_page=25, end_page=608):
+    # Each page's text is written to text_file as soon as it is ready
+    # Threads are enough: tesseract runs outside the GIL (tesserocr releases
+    # it, pytesseract waits on a subprocess)
+    with ThreadPoolExecutor(max_workers=OCR_WORKERS) as executor, \
+            (fitz.open(pdf_path) if fitz is not None else nullcontext()) as doc:
+        for first in range(start_page, end_page + 1, PAGE_CHUNK_SIZE):
+            last = min(first + PAGE_CHUNK_SIZE - 1, end_page)
+            if doc is not None:
+                # Use the embedded text of typeset pages and only render and
+                # OCR the pages that have (almost) none. Rendering stays on
+                # this thread, since a fitz document isn't thread-safe.
+                texts = [doc[i - 1].get_text() for i in range(first, last + 1)]
+                ocr_pages = [i for i, t in enumerate(texts, start=first)
+                             if len(t.strip()) <= MIN_EMBEDDED_CHARS]
+                images = [render_page(doc, i) for i in ocr_pages]
+                ocr_texts = executor.map(ocr_page, images)
+                for i, page_text in zip(ocr_pages, ocr_texts):
+                    texts[i - first] = page_text
+                del images
+            else:
+                # Convert only this chunk of the page range to images, rendered
+                # straight to 8-bit grayscale (a third of the RGB pixel data)
+                images = convert_from_path(pdf_path, first_page=first, last_page=last,
+                                           dpi=OCR_DPI, grayscale=True)
+                # map() yields results in page order
+                texts = list(executor.map(ocr_page, images))
+                del images
+            for i, page_text in enumerate(texts, start=first):
+                text_file.write(f"\n--- Page {i} ---\n" + page_text)
+                print(f"Processed page {i}")
 
 pdf_path = "Vol2.pdf"
-text = ocr_pdf(pdf_path)
 
 text_file_path = "extracted_text.txt"
 with open(text_file_path, "w", encoding="utf-8") as text_file:
-    text_file.write(text)
\ No newline at end of file
+    ocr_pdf(pdf_path, text_file)
\ No newline at end of file
@@ -1,53 +1,91 @@
+import functools
 import json
+import mmap
+import os
 import re
+try:
+    import ahocorasick
+except ImportError:  # find_headings falls back to a regex alternation
+    ahocorasick = None
+try:
+    import orjson
+except ImportError:  # the JSON is written with the json module instead
+    orjson = None
 
-def split_careers_to_json(careers, text_file_path, output_path="careers.json"):
-    # Sort headings by length to avoid substring conflicts
-    careers_sorted = sorted(careers, key=len, reverse=True)
+@functools.lru_cache(maxsize=8)
+def build_matcher(careers):
+    """
+    careers: tuple of career headings
+    returns: Aho-Corasick automaton over the headings (or a compiled regex
+    alternation without pyahocorasick), built once per heading list
+    """
+    if ahocorasick is None:
+        # Sort headings by length to avoid substring conflicts
+        careers_sorted = sorted(careers, key=len, reverse=True)
+        return re.compile("|".join(re.escape(c) for c in careers_sorted))
+
+    automaton = ahocorasick.Automaton()
+    for c in careers:
+        automaton.add_word(c, len(c))
+    automaton.make_automaton()
+    return automaton
+
+def find_headings(careers, text):
+    """
+    returns: (start, end) spans of career headings in text, left to right and
+    non-overlapping, taking the longest heading where several start at the
+    same position
+    """
+    matcher = build_matcher(tuple(careers))
+    if ahocorasick is None:
+        return [m.span() for m in matcher.finditer(text)]
 
-    pattern = r"(" + "|".join(re.escape(c) for c in careers_sorted) + r")"
+    # One pass of the automaton finds every occurrence of every heading,
+    # then overlaps are resolved the way the regex alternation would
+    found = sorted((end - n + 1, -n) for end, n in matcher.iter(text))
+    spans = []
+    last_end = 0
+    for start, neg_len in found:
+        if start >= last_end:
+            last_end = start - neg_len
+            spans.append((start, last_end))
+    return spans
 
-    with open(text_file_path, "r", encoding="utf-8") as f:
-        text = f.read()
+def read_text(path):
+    """
+    Decode a UTF-8 file straight from a memory map, so no full-size bytes
+    copy is held next to the decoded str (newlines are not translated, which
+    is fine for the whitespace-collapsed cleaned text)
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:  # empty files can't be mapped
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return str(mm, "utf-8")
+
+def split_careers_to_json(careers, text_file_path, output_path="careers.json"):
+    text = read_text(text_file_path)
 
-    parts = re.split(pattern, text)
+    # Each career block runs from the end of its heading to the start of the
+    # next heading (or the end of the text)
+    spans = find_headings(careers, text)
+    ends = [start for start, _ in spans[1:]] + [len(text)]
 
     result = []
-    current_title = None
-    buffer = []
-
-    id_counter = 1
-
-    for part in parts:
-        stripped = part.strip()
-        if stripped in careers:
-            if current_title:
-                content = " ".join(buffer)
-                result.append({
-                    "id": id_counter,
-                    "title": current_title,
-                    "content": content
-                })
-                id_counter += 1
-
-            current_title = stripped
-            buffer = []
-        else:
-            if current_title:
-                buffer.append(part)
-
-    # Last career block
-    if current_title:
-        content = " ".join(buffer)
+    for id_counter, ((start, title_end), end) in enumerate(zip(spans, ends), start=1):
         result.append({
             "id": id_counter,
-            "title": current_title,
-            "content": content
+            "title": text[start:title_end],
+            "content": text[title_end:end]
         })
 
-    # Write JSON
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
+    # Write JSON (orjson's indented output matches json.dump's byte for byte)
+    if orjson is not None:
+        with open(output_path, "wb") as f:
+            f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+    else:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
 
     return result
 